@@ -0,0 +1,284 @@
+import math
+
+
+# =========================
+# Config
+# =========================
+SKETCH_ACCURACY = 0.01     # relative error of sketch quantiles
+SKETCH_MAX_BUCKETS = 2048  # lowest buckets collapse beyond this
+SKETCH_MIN_VALUE = 1e-9    # values below this land in the zero bucket
+WEALTH_PERCENTILES = [0.1, 0.5, 0.9, 0.99]
+
+
+# =========================
+# Running moments
+# =========================
+class RunningStats:
+    """
+    Welford running mean / variance; merge() is Chan et al.'s
+    pairwise update, so partial aggregates combine exactly.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    def merge(self, other):
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+# =========================
+# Quantile / Gini sketch
+# =========================
+class WealthSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch-style) over non-negative
+    values. Bucket counts add under merge(), so merging sketches is
+    exactly the sketch of the combined stream.
+    """
+
+    def __init__(self, accuracy=SKETCH_ACCURACY, max_buckets=SKETCH_MAX_BUCKETS):
+        self.accuracy = accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}  # index -> count
+        self.zero = 0
+        self.n = 0
+
+    def add(self, x, count=1):
+        self.n += count
+        if x < SKETCH_MIN_VALUE:
+            self.zero += count
+            return
+
+        i = math.ceil(math.log(x) / self.log_gamma)
+        self.buckets[i] = self.buckets.get(i, 0) + count
+        self.collapse()
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different accuracy")
+
+        self.n += other.n
+        self.zero += other.zero
+        for i, c in other.buckets.items():
+            self.buckets[i] = self.buckets.get(i, 0) + c
+        self.collapse()
+        return self
+
+    def collapse(self):
+        # fold the lowest buckets together; only low quantiles lose accuracy
+        while len(self.buckets) > self.max_buckets:
+            lo, nxt = sorted(self.buckets)[:2]
+            self.buckets[nxt] += self.buckets.pop(lo)
+
+    def value(self, i):
+        return 2 * self.gamma ** i / (self.gamma + 1)
+
+    def items(self):
+        """
+        (representative value, count) pairs in increasing value order.
+        """
+        if self.zero:
+            yield 0.0, self.zero
+        for i in sorted(self.buckets):
+            yield self.value(i), self.buckets[i]
+
+    def quantile(self, q):
+        if self.n == 0:
+            return None
+
+        rank = q * (self.n - 1)
+        seen = 0
+        for v, c in self.items():
+            seen += c
+            if seen > rank:
+                return v
+        return v
+
+    def gini(self):
+        """
+        Gini coefficient of the sketched distribution, from the grouped
+        form sum_ij c_i c_j |v_i - v_j| / (2 n sum_i c_i v_i).
+        """
+        total = sum(v * c for v, c in self.items())
+        if self.n == 0 or total == 0:
+            return 0.0
+
+        below = 0
+        diff = 0.0
+        for v, c in self.items():
+            above = self.n - below - c
+            diff += c * v * (below - above)
+            below += c
+
+        return diff / (self.n * total)
+
+
+# =========================
+# Per-group aggregates
+# =========================
+class GroupStats:
+    def __init__(self):
+        self.wealth = RunningStats()
+        self.wealth_sketch = WealthSketch()
+        self.consumed = RunningStats()          # value per consumption
+        self.first_resource = RunningStats()    # tick of first consumption
+        self.never_consumed = 0
+
+    def merge(self, other):
+        self.wealth.merge(other.wealth)
+        self.wealth_sketch.merge(other.wealth_sketch)
+        self.consumed.merge(other.consumed)
+        self.first_resource.merge(other.first_resource)
+        self.never_consumed += other.never_consumed
+        return self
+
+
+class InequalityAggregator:
+    """
+    Online inequality statistics keyed by (policy, player class).
+    Memory is fixed per group regardless of how many runs are streamed
+    in; aggregators from parallel workers combine with merge().
+    """
+
+    def __init__(self):
+        self.groups = {}  # (policy, player_class) -> GroupStats
+
+    def group(self, policy, player_class):
+        key = (policy, player_class)
+        if key not in self.groups:
+            self.groups[key] = GroupStats()
+        return self.groups[key]
+
+    # -------------------------
+    # Stream input
+    # -------------------------
+    def observe_wealth(self, policy, player_class, wealth):
+        g = self.group(policy, player_class)
+        g.wealth.add(wealth)
+        g.wealth_sketch.add(wealth)
+
+    def observe_consume(self, policy, player_class, value):
+        self.group(policy, player_class).consumed.add(value)
+
+    def observe_first_resource(self, policy, player_class, t):
+        g = self.group(policy, player_class)
+        if t is None:
+            g.never_consumed += 1
+        else:
+            g.first_resource.add(t)
+
+    def merge(self, other):
+        for key, g in other.groups.items():
+            self.group(*key).merge(g)
+        return self
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def policies(self):
+        return sorted({policy for policy, _ in self.groups}, key=str)
+
+    def classes(self, policy):
+        return sorted((c for p, c in self.groups if p == policy), key=str)
+
+    def policy_sketch(self, policy):
+        sketch = WealthSketch()
+        for c in self.classes(policy):
+            sketch.merge(self.groups[(policy, c)].wealth_sketch)
+        return sketch
+
+    def gini(self, policy, player_class=None):
+        if player_class is None:
+            return self.policy_sketch(policy).gini()
+        return self.groups[(policy, player_class)].wealth_sketch.gini()
+
+    def wealth_gap(self, policy, rich, poor, q=0.5):
+        """
+        Difference between the q-th wealth quantiles of two player classes.
+        """
+        hi = self.groups[(policy, rich)].wealth_sketch.quantile(q)
+        lo = self.groups[(policy, poor)].wealth_sketch.quantile(q)
+        if hi is None or lo is None:
+            return None
+        return hi - lo
+
+    def summary(self, percentiles=WEALTH_PERCENTILES):
+        out = {}
+        for policy in self.policies():
+            classes = {}
+            for c in self.classes(policy):
+                g = self.groups[(policy, c)]
+                classes[c] = {
+                    "runs": g.wealth.n,
+                    "wealth_mean": g.wealth.mean,
+                    "wealth_std": g.wealth.std,
+                    "wealth_percentiles": {q: g.wealth_sketch.quantile(q) for q in percentiles},
+                    "gini": g.wealth_sketch.gini(),
+                    "consumptions": g.consumed.n,
+                    "first_resource_mean": g.first_resource.mean if g.first_resource.n else None,
+                    "never_consumed": g.never_consumed,
+                }
+            out[policy] = {
+                "gini": self.gini(policy),
+                "classes": classes,
+            }
+        return out
+
+
+# =========================
+# Sim adapter
+# =========================
+class SimRecorder:
+    """
+    Feeds one Sim run into an aggregator: call observe() after every
+    sim.step() and finish() once at the end of the run.
+    """
+
+    def __init__(self, aggregator, policy):
+        self.aggregator = aggregator
+        self.policy = policy
+        self.first = {}  # player name -> tick of first consumption, this run only
+
+    def observe(self, sim):
+        for kind, r, name, amount in sim.events:
+            if kind != "consume":
+                continue
+            self.aggregator.observe_consume(self.policy, name, amount)
+            self.first.setdefault(name, sim.t)
+
+    def finish(self, sim):
+        for p in (sim.A, sim.B):
+            self.aggregator.observe_wealth(self.policy, p.name, p.wealth)
+            self.aggregator.observe_first_resource(self.policy, p.name, self.first.get(p.name))
+        self.first = {}
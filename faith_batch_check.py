@@ -0,0 +1,172 @@
+"""
+Checks compile_batch against a local stand-in for the chat completions
+endpoint, so batch behaviour can be verified without an API key:
+
+    python faith_batch_check.py
+
+The stand-in answers every narrative after LATENCY_S. Narratives
+containing BAD get an off-schema reply; narratives containing DOWN
+always get a 500.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# faith_system builds its module-level client on import
+os.environ.setdefault("OPENAI_API_KEY", "local")
+
+from openai import AsyncOpenAI
+import openai
+from faith_system import compile_batch_async
+from state import FaithParameters
+
+
+LATENCY_S = 0.05
+RETRIES = 2
+CONCURRENCY_LEVELS = [1, 4, 16]
+
+GOOD_REPLY = {
+    "teleport_access": {"A": True, "B": False},
+    "spawn_bias": {"A": 0.8, "B": None},
+    "location_restriction": None,
+    "vision_radius": {"A": None, "B": 1000},
+    "inactive_windows": None,
+}
+BAD_REPLY = {"vision_radius": {"A": "far", "B": None}}
+
+
+# =========================
+# Stand-in server
+# =========================
+class StandInServer:
+    def __init__(self, latency_s=LATENCY_S):
+        self.latency_s = latency_s
+        self.calls = []
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, like the real endpoint
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                narrative = body["messages"][1]["content"]
+                with server.lock:
+                    server.calls.append(narrative)
+                time.sleep(server.latency_s)
+
+                if "DOWN" in narrative:
+                    self.reply(500, {"error": {"message": "stand-in failure"}})
+                    return
+
+                content = BAD_REPLY if "BAD" in narrative else GOOD_REPLY
+                self.reply(200, {
+                    "id": "stand-in",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": json.dumps(content)},
+                    }],
+                })
+
+            def reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        class Server(ThreadingHTTPServer):
+            # the default backlog of 5 stalls connects at high concurrency
+            request_queue_size = 128
+
+        self.httpd = Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_port}/v1"
+
+    def calls_for(self, marker):
+        return sum(marker in c for c in self.calls)
+
+    def compile(self, narratives, **kwargs):
+        self.calls.clear()
+        return asyncio.run(self.compile_async(narratives, **kwargs))
+
+    async def compile_async(self, narratives, **kwargs):
+        # a caller-supplied client is the caller's to close
+        async with AsyncOpenAI(base_url=self.base_url, api_key="local", max_retries=0) as client:
+            return await compile_batch_async(
+                narratives, async_client=client, backoff_s=0.01, retries=RETRIES, **kwargs
+            )
+
+
+# =========================
+# Checks
+# =========================
+def check_dedup(server):
+    narratives = [f"variant {i}" for i in range(32)] + [f"variant {i}" for i in range(10)]
+    results = server.compile(narratives)
+
+    assert len(results) == 42
+    assert len(server.calls) == 32, len(server.calls)
+    assert all(isinstance(r, FaithParameters) for r in results)
+
+    # repeated slots are independent copies
+    results[32].vision_radius["B"] = 0
+    assert results[0].vision_radius["B"] == 1000
+    print("dedup: 42 narratives -> 32 calls, repeats are independent copies")
+
+def check_schema_not_retried(server):
+    results = server.compile(["fine", "BAD reply"], return_exceptions=True)
+
+    assert isinstance(results[0], FaithParameters)
+    assert isinstance(results[1], ValueError)
+    assert server.calls_for("BAD") == 1, server.calls_for("BAD")
+    print("off-schema reply: 1 call, ValueError in its slot")
+
+def check_failure_isolated(server):
+    results = server.compile(["first", "DOWN always", "last"], return_exceptions=True)
+
+    assert isinstance(results[0], FaithParameters)
+    assert isinstance(results[1], openai.InternalServerError)
+    assert isinstance(results[2], FaithParameters)
+    assert server.calls_for("DOWN") == RETRIES + 1
+    print(f"persistent 500: {RETRIES + 1} attempts, only its own slot fails")
+
+def check_concurrency_scaling(server):
+    narratives = [f"sweep {i}" for i in range(32)]
+    times = []
+
+    for concurrency in CONCURRENCY_LEVELS:
+        start = time.perf_counter()
+        server.compile(narratives, concurrency=concurrency)
+        times.append(time.perf_counter() - start)
+
+    assert all(a > b for a, b in zip(times, times[1:])), times
+    print("wall time by concurrency: " + ", ".join(
+        f"{c} -> {t:.2f}s" for c, t in zip(CONCURRENCY_LEVELS, times)
+    ))
+
+
+if __name__ == "__main__":
+    server = StandInServer()
+
+    check_dedup(server)
+    check_schema_not_retried(server)
+    check_failure_isolated(server)
+    check_concurrency_scaling(server)
+
+    print("all batch checks passed")
@@ -1,4 +1,8 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+import openai
+import asyncio
+import copy
+import random
 import json
 from dataclasses import dataclass
 import os
@@ -10,6 +14,11 @@ dotenv.load_dotenv(dotenv_path)
 key = os.getenv("OPENAI_API_KEY")
 client = OpenAI()
 
+MODEL = "gpt-4.1-mini"
+BATCH_CONCURRENCY = 8     # in-flight requests
+BATCH_RETRIES = 4         # attempts after the first
+BATCH_BACKOFF_S = 0.5     # base delay, doubled per attempt
+
 
 FAITH_OUTPUT = """teleport_access: {{ "A": boolean, "B": boolean }} or null
 spawn_bias: {{ "A": number, "B": number }} or null
@@ -17,6 +26,64 @@ location_restriction: {{ "A": [[lon,lat],[lon,lat]] or null, "B": same }} or nul
 vision_radius: {{ "A": number, "B": number }} or null
 inactive_windows: {{ "A": [t1,t2] or null, "B": same }} or null"""
 
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+# =========================
+# Schema validation
+# =========================
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+def _is_point(v):
+    return isinstance(v, list) and len(v) == 2 and all(_is_number(x) for x in v)
+
+FAITH_SCHEMA = {
+    "teleport_access": lambda v: isinstance(v, bool),
+    "spawn_bias": _is_number,
+    "location_restriction": lambda v: isinstance(v, list) and len(v) == 2 and all(_is_point(p) for p in v),
+    "vision_radius": _is_number,
+    "inactive_windows": _is_point,
+}
+
+def parse_faith_parameters(raw_json, strict=False) -> FaithParameters:
+    """
+    Parse the compiler's JSON reply, raising ValueError if it does not
+    match FAITH_OUTPUT. Unknown keys are ignored unless `strict`.
+    """
+    data = json.loads(raw_json)
+
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+
+    unknown = set(data) - set(FAITH_SCHEMA)
+    if strict and unknown:
+        raise ValueError(f"unknown parameters: {sorted(unknown)}")
+
+    for key, check in FAITH_SCHEMA.items():
+        per_player = data.get(key)
+        if per_player is None:
+            continue
+
+        if not isinstance(per_player, dict) or not set(per_player) <= {"A", "B"}:
+            raise ValueError(f"{key}: expected {{'A': ..., 'B': ...}}, got {per_player!r}")
+
+        for name, v in per_player.items():
+            if v is not None and not check(v):
+                raise ValueError(f"{key}[{name}]: invalid value {v!r}")
+
+    return FaithParameters(
+        teleport_access=data.get("teleport_access"),
+        spawn_bias=data.get("spawn_bias"),
+        location_restriction=data.get("location_restriction"),
+        vision_radius=data.get("vision_radius"),
+        inactive_windows=data.get("inactive_windows"),
+    )
+
 
 class FaithSystem:
     def __init__(self, narrative: str):
@@ -45,7 +112,7 @@ class FaithSystem:
             specific area defined by the corners of the bounding box) 
             - vision_radius: float (related to the extent to which a player can see if there are resources,
               default is infinite visibility. Minimum is 1000m) 
-            - player_inactive_window: [t1, t2] (to say a player cannot move for t1 seconds and after every t2 seconds)
+            - inactive_windows: [t1, t2] (to say a player cannot move for t1 seconds and after every t2 seconds)
 
             Narrative:
             \"\"\"
@@ -55,9 +122,9 @@ class FaithSystem:
             Return JSON with the variables, matching the narrative to the variable and giving an appropriate value.  
         """
 
-    def run(self) -> FaithParameters:
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
+    def request(self):
+        return dict(
+            model=MODEL,
             messages=[
                 {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": self.user_prompt}
@@ -66,16 +133,86 @@ class FaithSystem:
             temperature=0.0
         )
 
+    def run(self) -> FaithParameters:
+        response = client.chat.completions.create(**self.request())
+
         raw_json = response.choices[0].message.content
 
+        return parse_faith_parameters(raw_json)
 
-        data = json.loads(raw_json)
+    async def run_async(self, async_client, strict=False) -> FaithParameters:
+        response = await async_client.chat.completions.create(**self.request())
 
-        return FaithParameters(
-            teleport_access=data.get("teleport_access"),
-            spawn_bias=data.get("spawn_bias"),
-            location_restriction=data.get("location_restriction"),
-            vision_radius=data.get("vision_radius"),
-            inactive_windows=data.get("inactive_windows"),
-        )
+        raw_json = response.choices[0].message.content
+
+        return parse_faith_parameters(raw_json, strict)
+
+
+# =========================
+# Batch compilation
+# =========================
+async def compile_batch_async(narratives, async_client=None,
+                              concurrency=BATCH_CONCURRENCY,
+                              retries=BATCH_RETRIES,
+                              backoff_s=BATCH_BACKOFF_S,
+                              strict=False,
+                              return_exceptions=False):
+    """
+    Compile many narratives concurrently, at most `concurrency` requests
+    in flight. Identical narratives are compiled once; repeated slots get
+    their own copy of the result, so they can be edited independently.
+    Transport errors are retried; off-schema replies are not, since the
+    request is deterministic. With `return_exceptions`, a narrative that
+    still fails gets its exception in place of a result instead of
+    failing the batch. Pass an AsyncOpenAI(base_url=...) to target a
+    local stand-in server (see faith_batch_check.py).
+    """
+    if async_client is None:
+        # retries are handled here, not inside the client
+        async with AsyncOpenAI(max_retries=0) as own_client:
+            return await compile_batch_async(
+                narratives, own_client, concurrency, retries, backoff_s,
+                strict, return_exceptions,
+            )
+
+    limit = asyncio.Semaphore(concurrency)
+
+    async def compile_one(narrative):
+        faith = FaithSystem(narrative)
+
+        for attempt in range(retries + 1):
+            try:
+                async with limit:
+                    return await faith.run_async(async_client, strict)
+            except RETRYABLE_ERRORS:
+                if attempt == retries:
+                    raise
+            # exponential backoff with jitter, without holding a slot
+            await asyncio.sleep(backoff_s * 2 ** attempt * (0.5 + random.random()))
+
+    unique = list(dict.fromkeys(narratives))
+    results = await asyncio.gather(
+        *(compile_one(n) for n in unique),
+        return_exceptions=return_exceptions,
+    )
+    compiled = dict(zip(unique, results))
+
+    out = []
+    seen = set()
+    for n in narratives:
+        result = compiled[n]
+        if n in seen and isinstance(result, FaithParameters):
+            result = copy.deepcopy(result)
+        seen.add(n)
+        out.append(result)
+
+    return out
+
+def compile_batch(narratives, **kwargs):
+    """
+    Blocking wrapper around compile_batch_async; returns one
+    FaithParameters (or exception, with return_exceptions) per narrative,
+    in input order.
+    """
+    return asyncio.run(compile_batch_async(narratives, **kwargs))
 
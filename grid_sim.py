@@ -0,0 +1,253 @@
+import math
+import numpy as np
+import networkx as nx
+
+from sim import Sim, MESHSIZE_M, CONSUME_RADIUS_CELLS
+
+
+# =========================
+# Neighborhood kernels
+# =========================
+def manhattan_offsets(radius):
+    return np.array([
+        (dr, dc)
+        for dr in range(-radius, radius + 1)
+        for dc in range(-radius, radius + 1)
+        if abs(dr) + abs(dc) <= radius
+    ])
+
+
+# =========================
+# Grid-backed simulation
+# =========================
+class GridSim(Sim):
+    """
+    Sim variant that bins the walk graph's nodes onto a meshsize_m grid
+    and keeps live resources in value / count grids. Players target the
+    nearest non-empty cell within vision and consume everything within
+    consume_radius_cells of their cell; coarser cells mean fewer cells to
+    search and a wider, more approximate reach.
+
+    Consumption gathers each player's Manhattan window from the grids
+    rather than convolving an agent count grid, which is cheaper for a
+    handful of players. Movement follows Sim's shortest paths unless
+    greedy_moves is set, in which case players take the neighbour closest
+    to the target in a straight line -- faster, but approximate at any
+    meshsize_m.
+    """
+
+    def __init__(self, G, transit_nodes,
+                 meshsize_m=MESHSIZE_M,
+                 consume_radius_cells=CONSUME_RADIUS_CELLS,
+                 greedy_moves=False,
+                 **kwargs):
+        self.meshsize_m = meshsize_m
+        self.consume_radius_cells = consume_radius_cells
+        self.greedy_moves = greedy_moves
+        self.kernel = manhattan_offsets(consume_radius_cells)
+
+        super().__init__(G, transit_nodes, **kwargs)
+
+        self.routes = {}  # player name -> (target, remaining path)
+        self.rasterize()
+
+    # -------------------------
+    # Rasterization
+    # -------------------------
+    def to_cell(self, x, y):
+        return (
+            int((y - self.origin[1]) // self.meshsize_m),
+            int((x - self.origin[0]) // self.meshsize_m),
+        )
+
+    def rasterize(self):
+        xs = np.array([xy[0] for xy in self.node_xy.values()])
+        ys = np.array([xy[1] for xy in self.node_xy.values()])
+        self.origin = (xs.min(), ys.min())
+
+        last = self.to_cell(xs.max(), ys.max())
+        self.shape = (last[0] + 1, last[1] + 1)
+
+        self.node_cell = {
+            n: self.to_cell(x, y) for n, (x, y) in self.node_xy.items()
+        }
+
+        self.value_grid = np.zeros(self.shape, dtype=np.float64)
+        self.count_grid = np.zeros(self.shape, dtype=np.int32)
+        self.bias_grids = {}  # resource bias -> count grid
+        self.cell_rids = {}   # cell -> set of rids
+
+        for r in self.resources.values():
+            self.grid_add(r)
+
+    # -------------------------
+    # Resource grids
+    # -------------------------
+    def bias_grid(self, bias):
+        if bias not in self.bias_grids:
+            self.bias_grids[bias] = np.zeros(self.shape, dtype=np.int32)
+        return self.bias_grids[bias]
+
+    def grid_add(self, r):
+        cell = self.node_cell[r.node]
+        self.value_grid[cell] += self.resource_value(r)
+        self.count_grid[cell] += 1
+        self.bias_grid(r.bias)[cell] += 1
+        self.cell_rids.setdefault(cell, set()).add(r.rid)
+
+    def add_resource(self, r):
+        super().add_resource(r)
+        self.grid_add(r)
+
+    def remove_resource(self, r, kind, player=None, amount=None):
+        super().remove_resource(r, kind, player, amount)
+
+        cell = self.node_cell[r.node]
+        self.count_grid[cell] -= 1
+        self.bias_grid(r.bias)[cell] -= 1
+        self.cell_rids[cell].discard(r.rid)
+
+        if self.count_grid[cell] == 0:
+            self.value_grid[cell] = 0.0   # no float drift on empty cells
+            del self.cell_rids[cell]
+        else:
+            self.value_grid[cell] -= self.resource_value(r)
+
+    def expire_resources(self):
+        if self.resource_decay:
+            self.value_grid *= 1 - self.resource_decay
+        super().expire_resources()
+
+    # -------------------------
+    # Targeting
+    # -------------------------
+    def visible_cells(self, p):
+        grids = [g for bias, g in self.bias_grids.items() if bias is None or bias == p.name]
+        if not grids:
+            return np.empty((0, 2), dtype=int)
+
+        r0, c0 = self.node_cell[p.node]
+
+        window = math.inf
+        if p.vision_radius and math.isfinite(p.vision_radius):
+            window = math.ceil(p.vision_radius / self.meshsize_m)
+
+        # few live cells: checking them beats scanning the vision crop
+        if (2 * window + 1) ** 2 > len(self.cell_rids):
+            cells = [c for c in self.cell_rids if any(g[c] for g in grids)]
+            return np.array(cells).reshape(-1, 2)
+
+        lo_r, lo_c = max(0, r0 - window), max(0, c0 - window)
+        hi_r, hi_c = r0 + window + 1, c0 + window + 1
+        visible = sum(g[lo_r:hi_r, lo_c:hi_c] for g in grids)
+        return np.argwhere(visible > 0) + (lo_r, lo_c)
+
+    def nearest_resource(self, p):
+        if not self.resources:
+            return None, None
+
+        cells = self.visible_cells(p)
+        if len(cells) == 0:
+            return None, float("inf")
+
+        dist = np.hypot(*(cells - self.node_cell[p.node]).T) * self.meshsize_m
+        if p.vision_radius:
+            dist[dist > p.vision_radius] = np.inf
+
+        i = int(np.argmin(dist))
+        if not np.isfinite(dist[i]):
+            return None, float("inf")
+
+        cell = (int(cells[i][0]), int(cells[i][1]))
+        for rid in self.cell_rids[cell]:
+            r = self.resources[rid]
+            if r.bias is None or r.bias == p.name:
+                return r.node, float(dist[i])
+
+        return None, float("inf")
+
+    # -------------------------
+    # Movement
+    # -------------------------
+    def move_toward(self, p, target):
+        if not self.greedy_moves:
+            super().move_toward(p, target)
+            return
+
+        # keep following a detour computed out of a dead end
+        route = self.routes.get(p.name)
+        if route and route[0] == target and route[1] and route[1][0] == p.node:
+            path = route[1]
+            if len(path) > 1:
+                p.node = path[1]
+            self.routes[p.name] = (target, path[1:])
+            return
+
+        tx, ty = self.node_xy[target]
+        x, y = self.node_xy[p.node]
+        best = None
+        best_d = math.hypot(x - tx, y - ty)
+
+        for n in self.G.neighbors(p.node):
+            nx_, ny_ = self.node_xy[n]
+            d = math.hypot(nx_ - tx, ny_ - ty)
+            if d < best_d:
+                best, best_d = n, d
+
+        if best is not None:
+            p.node = best
+            return
+
+        # greedy step is stuck: fall back to an exact route and commit to it
+        path = self.route(p.node, target)
+        if path is None:
+            return
+        if len(path) > 1:
+            p.node = path[1]
+        self.routes[p.name] = (target, path[1:])
+
+    def route(self, source, target):
+        try:
+            return nx.shortest_path(self.G, source=source, target=target, weight="length")
+        except nx.NetworkXNoPath:
+            return None
+
+    # -------------------------
+    # Consumption
+    # -------------------------
+    def consume(self):
+        players = (self.A, self.B)
+        cells = np.array([self.node_cell[p.node] for p in players])
+
+        # each player's (2r+1)^2 Manhattan window, clipped to the raster
+        win = cells[:, None, :] + self.kernel
+        inside = ((win >= 0) & (win < self.shape)).all(axis=2)
+        win = np.where(inside[..., None], win, 0)
+        flat = np.ravel_multi_index((win[..., 0], win[..., 1]), self.shape)
+
+        live = inside & (self.count_grid.ravel()[flat] > 0)
+        if not live.any():
+            return
+
+        # split each reachable cell evenly between the players reaching it
+        live_cells, inv, reach = np.unique(flat[live], return_inverse=True, return_counts=True)
+        share = np.zeros(flat.shape)
+        share[live] = self.value_grid.ravel()[flat[live]] / reach[inv]
+
+        for p, gain in zip(players, share.sum(axis=1)):
+            p.wealth += gain
+
+        receivers = {}
+        for i, k in zip(*np.nonzero(live)):
+            receivers.setdefault(flat[i, k], []).append(players[i].name)
+
+        # one consume event per receiving player, carrying their share
+        for f in live_cells:
+            names = receivers[f]
+            cell = tuple(int(x) for x in np.unravel_index(f, self.shape))
+            for rid in list(self.cell_rids[cell]):
+                r = self.resources[rid]
+                amount = self.resource_value(r) / len(names)
+                self.remove_resource(r, "consume", names[0], amount)
+                for name in names[1:]:
+                    self.events.append(("consume", r, name, amount))
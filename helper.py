@@ -264,6 +264,9 @@ def run_2d_sim(G_proj, sim, transit_nodes):
     wA_hist = []
     wB_hist = []
 
+    # ---- live resource markers, rid -> (xy, color) ----
+    res_markers = {}
+
     # ---- animation update ----
     def update(frame):
         sim.step()
@@ -285,16 +288,16 @@ def run_2d_sim(G_proj, sim, transit_nodes):
         scat_B.set_offsets([[Bx, By]])
 
 
-        if sim.resources:
-            res_xy = [
-                (G_proj.nodes[r.node]["x"], G_proj.nodes[r.node]["y"])
-                for r in sim.resources
-            ]
+        # sync markers from this tick's spawn / consume / expire events
+        for kind, r, _, _ in sim.events:
+            if kind == "spawn":
+                xy = (G_proj.nodes[r.node]["x"], G_proj.nodes[r.node]["y"])
+                res_markers[r.rid] = (xy, BIAS_COLOR.get(r.bias, "gold"))
+            else:
+                res_markers.pop(r.rid, None)
 
-            res_colors = [
-                BIAS_COLOR.get(r.bias, "gold")
-                for r in sim.resources
-            ]
+        if res_markers:
+            res_xy, res_colors = zip(*res_markers.values())
 
             scat_res.set_offsets(res_xy)
             scat_res.set_color(res_colors)
@@ -1,4 +1,5 @@
 from sim import Sim
+from grid_sim import GridSim
 from helper import run_2d_sim, build_walkable_from_osmnx, load_transit_stop_nodes, get_flood_prone_roads
 import osmnx as ox
 from faith_system import FaithSystem
@@ -14,11 +15,15 @@ SF_RECTANGLE_VERTICES = [
 
 
 UNION_SQUARE_LATLON = (37.787994, -122.407437)  # (lat, lon)
+GRID_MODE = False  # rasterized consumption on a MESHSIZE_M grid
 
 G = build_walkable_from_osmnx(SF_RECTANGLE_VERTICES)
 Gp = ox.project_graph(G, to_crs="EPSG:3857")
 transit_nodes = load_transit_stop_nodes(G)
 
 
-sim = Sim(Gp, transit_nodes)          # simulation stays unprojected
+if GRID_MODE:
+    sim = GridSim(Gp, transit_nodes)
+else:
+    sim = Sim(Gp, transit_nodes)          # simulation stays unprojected
 run_2d_sim(Gp, sim, transit_nodes)   # rendering uses projected graph
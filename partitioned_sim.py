@@ -0,0 +1,491 @@
+import math
+import time
+import random
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from queue import Empty
+import numpy as np
+import networkx as nx
+
+from sim import SPAWN_PROB, RESOURCE_LIFETIME
+from state import Player, Resource
+from timing_wheel import TimingWheel
+
+
+# =========================
+# Config
+# =========================
+TILES = (2, 2)              # columns x rows
+HALO_M = 300                # network distance mirrored from neighbouring tiles
+AGENTS_PER_CLASS = 50
+PLAYER_CLASSES = ["A", "B"]
+MAX_MIGRANTS = 1024         # per tile per tick; extra movers wait a tick
+MAX_BORDER_RESOURCES = 1024 # per tile; extra are invisible to neighbours
+REPORT_POLL_S = 1.0         # how often the coordinator checks for dead workers
+
+AGENT_DTYPE = np.dtype([
+    ("aid", np.int64),
+    ("cls", np.int32),
+    ("dst", np.int32),
+    ("node", np.int64),
+    ("wealth", np.float64),
+    ("first", np.int64),    # tick of first consumption, -1 = none yet
+])
+
+RESOURCE_DTYPE = np.dtype([
+    ("rid", np.int64),
+    ("node", np.int64),
+    ("value", np.float64),
+])
+
+
+# =========================
+# Partitioning
+# =========================
+def partition_nodes(node_xy, tiles):
+    """
+    Assign every node to a spatial tile: rank cuts on x into columns,
+    then on y within each column, so tiles hold similar node counts.
+    With fewer nodes than tiles, the surplus tiles stay empty.
+    """
+    cols, rows = tiles
+    nodes = list(node_xy)
+    xs = np.array([node_xy[n][0] for n in nodes])
+    ys = np.array([node_xy[n][1] for n in nodes])
+
+    col = np.empty(len(nodes), dtype=int)
+    col[np.argsort(xs, kind="stable")] = np.arange(len(nodes)) * cols // len(nodes)
+
+    tile = np.empty(len(nodes), dtype=int)
+    for c in range(cols):
+        in_col = np.flatnonzero(col == c)
+        if len(in_col) == 0:
+            continue
+        order = in_col[np.argsort(ys[in_col], kind="stable")]
+        tile[order] = c * rows + np.arange(len(order)) * rows // len(order)
+
+    return dict(zip(nodes, tile.tolist()))
+
+def build_halos(G, tile_of, n_tiles, halo_m):
+    """
+    Per tile: the foreign nodes within halo_m of its boundary (plus every
+    direct foreign neighbour), so local paths can cross into neighbours.
+    """
+    U = G.to_undirected(as_view=True)
+
+    boundary = [set() for _ in range(n_tiles)]
+    for u, v in U.edges():
+        if tile_of[u] != tile_of[v]:
+            boundary[tile_of[u]].add(u)
+            boundary[tile_of[v]].add(v)
+
+    halos = []
+    for t in range(n_tiles):
+        halo = set()
+        if boundary[t]:
+            dist = nx.multi_source_dijkstra_path_length(U, boundary[t], cutoff=halo_m, weight="length")
+            halo.update(n for n in dist if tile_of[n] != t)
+            for b in boundary[t]:
+                halo.update(n for n in U.neighbors(b) if tile_of[n] != t)
+
+        halos.append(halo)
+
+    return halos
+
+
+# =========================
+# Shared-memory halo buffers
+# =========================
+class HaloBuffer:
+    """
+    One tile's outbound exchange area: migrating agents and the resources
+    on nodes its neighbours mirror, republished every tick.
+    """
+
+    def __init__(self, name=None):
+        size = 16 + AGENT_DTYPE.itemsize * MAX_MIGRANTS + RESOURCE_DTYPE.itemsize * MAX_BORDER_RESOURCES
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        buf = self.shm.buf
+        self.counts = np.ndarray((2,), dtype=np.int64, buffer=buf)
+        self.migrants = np.ndarray((MAX_MIGRANTS,), dtype=AGENT_DTYPE, buffer=buf, offset=16)
+        self.border = np.ndarray(
+            (MAX_BORDER_RESOURCES,), dtype=RESOURCE_DTYPE, buffer=buf,
+            offset=16 + AGENT_DTYPE.itemsize * MAX_MIGRANTS
+        )
+        if name is None:
+            self.counts[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        # drop numpy views before releasing the mapping
+        del self.counts, self.migrants, self.border
+        self.shm.close()
+
+
+# =========================
+# Tile worker
+# =========================
+class TileWorker:
+    def __init__(self, tile, n_tiles, G_local, tile_of, halo, neighbours, border_nodes,
+                 agents, vision, spawn_rate, resource_lifetime, seed):
+        self.tile = tile
+        self.n_tiles = n_tiles
+        self.G = G_local
+        self.tile_of = tile_of
+        self.halo = halo
+        self.neighbours = neighbours
+        self.border_nodes = border_nodes
+        self.vision = vision  # class index -> vision radius
+        self.spawn_rate = spawn_rate
+        self.resource_lifetime = resource_lifetime
+
+        self.node_xy = {n: (d["x"], d["y"]) for n, d in G_local.nodes(data=True)}
+        self.own_nodes = [n for n in G_local.nodes if tile_of[n] == tile]
+
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+
+        self.t = 0
+        self.rid = 0
+        self.resources = {}      # rid -> Resource
+        self.by_node = {}        # node -> set of rids
+        self.halo_resources = [] # (node, value) mirrored from neighbours
+        self.expiry = TimingWheel()
+
+        # aid -> (Player, class index, first consumption tick)
+        self.agents = {}
+        self.stats = {"agent_steps": 0, "consumed": 0, "migrated": 0, "deferred": 0}
+
+        for row in agents:
+            self.admit(row)
+
+    # -------------------------
+    # Agents
+    # -------------------------
+    def admit(self, row):
+        aid = int(row["aid"])
+        cls = int(row["cls"])
+        p = Player(PLAYER_CLASSES[cls], int(row["node"]), float(row["wealth"]),
+                   vision_radius=self.vision[cls])
+        self.agents[aid] = (p, cls, int(row["first"]))
+        self.consume(aid)
+
+    def consume(self, aid):
+        p, cls, first = self.agents[aid]
+        rids = self.by_node.get(p.node)
+        if not rids:
+            return
+
+        r = self.remove_resource(next(iter(rids)))
+        p.wealth += r.value
+        self.stats["consumed"] += 1
+        if first < 0:
+            self.agents[aid] = (p, cls, self.t)
+
+    def euclidean_dist(self, n1, n2):
+        x1, y1 = self.node_xy[n1]
+        x2, y2 = self.node_xy[n2]
+        return math.hypot(x1 - x2, y1 - y2)
+
+    def nearest_resource(self, p):
+        best_node = None
+        best_dist = float("inf")
+
+        candidates = [r.node for r in self.resources.values()]
+        candidates += [node for node, _ in self.halo_resources]
+
+        for node in candidates:
+            d = self.euclidean_dist(p.node, node)
+            if d <= p.vision_radius and d < best_dist:
+                best_node = node
+                best_dist = d
+
+        return best_node
+
+    def next_node(self, p):
+        target = self.nearest_resource(p)
+
+        if target is None or target == p.node:
+            nbrs = list(self.G.neighbors(p.node))
+            return self.rng.choice(nbrs) if nbrs else p.node
+
+        try:
+            path = nx.shortest_path(self.G, source=p.node, target=target, weight="length")
+            return path[1] if len(path) > 1 else p.node
+        except nx.NetworkXNoPath:
+            return p.node
+
+    # -------------------------
+    # Resources
+    # -------------------------
+    def add_resource(self, node, value=1):
+        # tile-strided ids stay unique across workers
+        r = Resource(self.rid * self.n_tiles + self.tile, node, value, None, born=self.t)
+        self.rid += 1
+
+        if self.resource_lifetime is not None:
+            r.expires = self.t + self.resource_lifetime
+            self.expiry.schedule(r.rid, r.expires)
+
+        self.resources[r.rid] = r
+        self.by_node.setdefault(node, set()).add(r.rid)
+
+    def remove_resource(self, rid):
+        r = self.resources.pop(rid)
+        self.expiry.cancel(rid)
+        self.by_node[r.node].discard(rid)
+        if not self.by_node[r.node]:
+            del self.by_node[r.node]
+        return r
+
+    def spawn_resources(self):
+        for _ in range(self.np_rng.poisson(self.spawn_rate)):
+            self.add_resource(self.rng.choice(self.own_nodes))
+
+    # -------------------------
+    # Tick
+    # -------------------------
+    def step(self, out):
+        self.t += 1
+
+        for rid in self.expiry.advance(self.t):
+            self.remove_resource(rid)
+        self.spawn_resources()
+
+        n_out = 0
+        for aid in list(self.agents):
+            p, cls, first = self.agents[aid]
+            self.stats["agent_steps"] += 1
+
+            nxt = self.next_node(p)
+            dst = self.tile_of[nxt]
+
+            if dst != self.tile:
+                if n_out == MAX_MIGRANTS:
+                    self.stats["deferred"] += 1
+                    continue
+                out.migrants[n_out] = (aid, cls, dst, nxt, p.wealth, first)
+                n_out += 1
+                del self.agents[aid]
+                continue
+
+            p.node = nxt
+            self.consume(aid)
+
+        self.stats["migrated"] += n_out
+
+        # publish resources neighbours can see
+        border = [r for r in self.resources.values() if r.node in self.border_nodes]
+        border = border[:MAX_BORDER_RESOURCES]
+        for i, r in enumerate(border):
+            out.border[i] = (r.rid, r.node, r.value)
+
+        out.counts[:] = (n_out, len(border))
+
+    def exchange(self, buffers):
+        self.halo_resources = []
+
+        for s in self.neighbours:
+            buf = buffers[s]
+            n_mig, n_border = buf.counts
+
+            for row in buf.migrants[:n_mig]:
+                if row["dst"] == self.tile:
+                    self.admit(row)
+
+            for row in buf.border[:n_border]:
+                node = int(row["node"])
+                if node in self.halo:
+                    self.halo_resources.append((node, float(row["value"])))
+
+    def results(self):
+        return [
+            (aid, PLAYER_CLASSES[cls], p.wealth, first if first >= 0 else None)
+            for aid, (p, cls, first) in self.agents.items()
+        ]
+
+
+def _tile_main(worker, buffer_names, barrier, queue, ticks):
+    buffers = [HaloBuffer(name) for name in buffer_names]
+    try:
+        out = buffers[worker.tile]
+        barrier.wait()
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            worker.step(out)
+            barrier.wait()   # all outbound buffers written
+            worker.exchange(buffers)
+            barrier.wait()   # all inbound buffers read
+        elapsed = time.perf_counter() - start
+
+        queue.put((worker.tile, None, worker.results(), worker.stats, elapsed))
+    except Exception as e:
+        barrier.abort()
+        queue.put((worker.tile, repr(e), [], {}, 0.0))
+    finally:
+        for buf in buffers:
+            buf.close()
+
+
+# =========================
+# Coordinator
+# =========================
+class PartitionedSim:
+    """
+    Domain-decomposed Sim: the projected graph is cut into spatial tiles,
+    each stepped by its own process with local resources and agents.
+    Boundary-crossing agents and border resources are exchanged through
+    shared-memory halo buffers at tick boundaries.
+    """
+
+    def __init__(self, G, params, tiles=TILES,
+                 agents_per_class=AGENTS_PER_CLASS,
+                 spawn_rate=SPAWN_PROB,
+                 halo_m=HALO_M,
+                 resource_lifetime=RESOURCE_LIFETIME,
+                 seed=0):
+        self.G = G
+        self.params = params
+        self.spawn_rate = spawn_rate
+        self.resource_lifetime = resource_lifetime
+        self.seed = seed
+        self.n_tiles = tiles[0] * tiles[1]
+
+        node_xy = {n: (G.nodes[n]["x"], G.nodes[n]["y"]) for n in G.nodes}
+        self.tile_of = partition_nodes(node_xy, tiles)
+
+        self.tile_nodes = [set() for _ in range(self.n_tiles)]
+        for n, t in self.tile_of.items():
+            self.tile_nodes[t].add(n)
+
+        self.halos = build_halos(G, self.tile_of, self.n_tiles, halo_m)
+
+        # tiles whose buffers each tile must read, in both directions
+        self.neighbours = [set() for _ in range(self.n_tiles)]
+        for t, halo in enumerate(self.halos):
+            for n in halo:
+                self.neighbours[t].add(self.tile_of[n])
+                self.neighbours[self.tile_of[n]].add(t)
+
+        # own nodes some neighbour mirrors
+        self.border_nodes = [set() for _ in range(self.n_tiles)]
+        for halo in self.halos:
+            for n in halo:
+                self.border_nodes[self.tile_of[n]].add(n)
+
+        vision = (params.vision_radius or {}) if params else {}
+        self.vision = [vision.get(c) or np.inf for c in PLAYER_CLASSES]
+
+        rng = random.Random(seed)
+        nodes = list(G.nodes)
+        self.agents = np.zeros(len(PLAYER_CLASSES) * agents_per_class, dtype=AGENT_DTYPE)
+        for aid in range(len(self.agents)):
+            self.agents[aid] = (aid, aid // agents_per_class, -1, rng.choice(nodes), 0.0, -1)
+
+        self.results = None
+
+    def make_worker(self, t):
+        local = self.tile_nodes[t] | self.halos[t]
+        starting = self.agents[[self.tile_of[int(n)] == t for n in self.agents["node"]]]
+
+        return TileWorker(
+            t, self.n_tiles, self.G.subgraph(local).copy(), self.tile_of, self.halos[t],
+            sorted(self.neighbours[t]), self.border_nodes[t], starting, self.vision,
+            self.spawn_rate * len(self.tile_nodes[t]) / len(self.tile_of),
+            self.resource_lifetime, self.seed + t,
+        )
+
+    def run(self, ticks):
+        ctx = mp.get_context("fork")
+        buffers = [HaloBuffer() for _ in range(self.n_tiles)]
+        barrier = ctx.Barrier(self.n_tiles)
+        queue = ctx.Queue()
+
+        procs = [
+            ctx.Process(
+                target=_tile_main,
+                args=(self.make_worker(t), [b.name for b in buffers], barrier, queue, ticks),
+            )
+            for t in range(self.n_tiles)
+        ]
+
+        try:
+            for p in procs:
+                p.start()
+            reports = self.collect(procs, queue)
+            for p in procs:
+                p.join()
+        finally:
+            # a dead worker leaves the others waiting on the barrier
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()
+                    p.join()
+            for b in buffers:
+                b.close()
+                b.shm.unlink()
+
+        errors = [(t, err) for t, err, *_ in reports if err]
+        if errors:
+            raise RuntimeError(f"tile workers failed: {errors}")
+
+        agents = sorted(a for _, _, res, _, _ in reports for a in res)
+        stats = {}
+        for _, _, _, s, _ in reports:
+            for k, v in s.items():
+                stats[k] = stats.get(k, 0) + v
+        elapsed = max(e for *_, e in reports)
+
+        self.results = {
+            "ticks": ticks,
+            "elapsed_s": elapsed,
+            "ticks_per_s": ticks / elapsed if elapsed else float("inf"),
+            "agent_steps_per_s": stats["agent_steps"] / elapsed if elapsed else float("inf"),
+            "stats": stats,
+            "agents": agents,  # (aid, class, wealth, first consumption tick)
+        }
+        return self.results
+
+    def collect(self, procs, queue):
+        reports = {}
+
+        while len(reports) < len(procs):
+            try:
+                report = queue.get(timeout=REPORT_POLL_S)
+                reports[report[0]] = report
+                continue
+            except Empty:
+                pass
+
+            # a worker that exited without reporting died outside its handler
+            # (OOM kill, signal); drain once in case it reported as it exited
+            dead = [t for t, p in enumerate(procs) if t not in reports and p.exitcode is not None]
+            while dead:
+                try:
+                    report = queue.get_nowait()
+                except Empty:
+                    break
+                reports[report[0]] = report
+                dead = [t for t in dead if t not in reports]
+
+            if dead:
+                codes = {t: procs[t].exitcode for t in dead}
+                raise RuntimeError(f"tile workers died without reporting, exit codes: {codes}")
+
+        return list(reports.values())
+
+    def record(self, aggregator, policy):
+        """
+        Stream the last run's per-agent outcomes into an InequalityAggregator.
+        """
+        for _, cls, wealth, first in self.results["agents"]:
+            aggregator.observe_wealth(policy, cls, wealth)
+            aggregator.observe_first_resource(policy, cls, first)
@@ -9,6 +9,7 @@ import networkx as nx
 import math
 from typing import Optional, List
 from faith_system import FaithSystem
+from timing_wheel import TimingWheel
 
 
 
@@ -29,10 +30,15 @@ SPAWN_PROB = 0.3         # per tick
 SPAWN_BIAS_RADIUS = 500 # in m
 RESOURCE_VALUES = [1]
 CONSUME_RADIUS_CELLS = 1   # Manhattan-ish
+RESOURCE_LIFETIME = 400    # ticks; None = never expire
+RESOURCE_DECAY = 0.0       # fraction of value lost per tick
+RESOURCE_MIN_VALUE = 0.05  # decayed resources below this expire
 
 
 class Sim:
-    def __init__(self, G, transit_nodes):
+    def __init__(self, G, transit_nodes,
+                 resource_lifetime=RESOURCE_LIFETIME,
+                 resource_decay=RESOURCE_DECAY):
         self.G = G
         self.transit_nodes = set(transit_nodes)
         self.nodes = list(G.nodes)
@@ -45,7 +51,17 @@ class Sim:
 
         self.t = 0
         self.rid = 0
-        self.resources = []
+        self.resources = {}  # rid -> Resource
+
+        # resource expiry
+        self.resource_lifetime = resource_lifetime
+        self.resource_decay = resource_decay
+        self.expiry = TimingWheel(now=self.t)
+
+        # (kind, resource, player name, amount) for the current tick,
+        # kind in {"spawn", "consume", "expire"}; amount is the value
+        # spawned / credited to the player, None on expiry
+        self.events = []
 
         self.A = Player("A", self.random_node())
         self.B = Player("B", self.random_node())
@@ -81,6 +97,43 @@ class Sim:
     # -------------------------
     # Resources
     # -------------------------
+    def resource_value(self, r):
+        if not self.resource_decay:
+            return r.value
+        return r.value * (1 - self.resource_decay) ** (self.t - r.born)
+
+    def resource_deadline(self, r):
+        deadline = None
+
+        if self.resource_lifetime is not None:
+            deadline = r.born + self.resource_lifetime
+
+        # tick at which the decayed value drops below RESOURCE_MIN_VALUE
+        if 0 < self.resource_decay < 1 and r.value > RESOURCE_MIN_VALUE:
+            ticks = math.log(RESOURCE_MIN_VALUE / r.value) / math.log(1 - self.resource_decay)
+            decay_deadline = r.born + math.ceil(ticks)
+            if deadline is None or decay_deadline < deadline:
+                deadline = decay_deadline
+
+        return deadline
+
+    def add_resource(self, r):
+        r.expires = self.resource_deadline(r)
+        if r.expires is not None:
+            self.expiry.schedule(r.rid, r.expires)
+
+        self.resources[r.rid] = r
+        self.events.append(("spawn", r, None, r.value))
+
+    def remove_resource(self, r, kind, player=None, amount=None):
+        del self.resources[r.rid]
+        self.expiry.cancel(r.rid)
+        self.events.append((kind, r, player, amount))
+
+    def expire_resources(self):
+        for rid in self.expiry.advance(self.t):
+            self.remove_resource(self.resources[rid], "expire")
+
     def nodes_within_radius(self, center_node, radius_m):
         cx, cy = self.node_xy[center_node]
 
@@ -118,7 +171,7 @@ class Sim:
         if node is None:
             node = self.random_node()
 
-        self.resources.append(Resource(self.rid, node, 1, biased_player))
+        self.add_resource(Resource(self.rid, node, 1, biased_player, born=self.t))
         self.rid += 1
 
     def nearest_resource(self, p):
@@ -128,7 +181,7 @@ class Sim:
         best_node = None
         best_dist = float("inf")
 
-        for r in self.resources:
+        for r in self.resources.values():
             if r.bias is None or r.bias == p.name:
 
                 d = self.euclidean_dist(p.node, r.node)
@@ -174,7 +227,7 @@ class Sim:
         best_dist = float("inf")
 
         for s in self.transit_nodes:
-            for r in self.resources:
+            for r in self.resources.values():
                 d = self.euclidean_dist(s, r.node)
                 if d < best_dist:
                     best_stop = s
@@ -186,12 +239,17 @@ class Sim:
     # Consumption
     # -------------------------
     def consume_if_close(self, p):
-        for i, r in enumerate(self.resources):
+        for r in self.resources.values():
             if r.node == p.node:
-                p.wealth += r.value
-                self.resources.pop(i)
+                value = self.resource_value(r)
+                p.wealth += value
+                self.remove_resource(r, "consume", p.name, value)
                 break
 
+    def consume(self):
+        self.consume_if_close(self.A)
+        self.consume_if_close(self.B)
+
     # -------------------------
     # Movement
     # -------------------------
@@ -223,6 +281,9 @@ class Sim:
                 p.node = random.choice(nbrs)
             return
 
+        self.move_toward(p, target)
+
+    def move_toward(self, p, target):
         try:
             path = nx.shortest_path(
                 self.G,
@@ -240,11 +301,12 @@ class Sim:
     # -------------------------
     def step(self):
         self.t += 1
-        
+        self.events = []
+
+        self.expire_resources()
         self.spawn_resource(self.params.spawn_bias)
 
         self.step_player(self.A)
         self.step_player(self.B)
 
-        self.consume_if_close(self.A)
-        self.consume_if_close(self.B)
\ No newline at end of file
+        self.consume()
\ No newline at end of file
@@ -18,8 +18,10 @@ class Player:
 class Resource:
     rid: int
     node: int
-    value: int
+    value: float
     bias: str
+    born: int = 0
+    expires: Optional[int] = None
 
 @dataclass
 class FaithParameters:
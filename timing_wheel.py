@@ -0,0 +1,96 @@
+class TimingWheel:
+    """
+    Hierarchical timing wheel keyed by integer ticks.
+
+    Level l has `slots` buckets of width slots**l ticks. Deadlines are
+    filed in the lowest level whose span covers them and cascade down
+    as time reaches their bucket, so schedule / cancel are O(1) and
+    advancing costs O(1) amortized per tick plus the expired keys.
+    """
+
+    def __init__(self, now=0, slots=64, levels=4):
+        self.now = now
+        self.slots = slots
+        self.levels = levels
+        self.wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self.where = {}  # key -> (level, slot)
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, key):
+        return key in self.where
+
+    # -------------------------
+    # Scheduling
+    # -------------------------
+    def _place(self, key, deadline):
+        delta = deadline - self.now
+
+        level = 0
+        span = self.slots
+        while delta >= span and level < self.levels - 1:
+            level += 1
+            span *= self.slots
+
+        slot = (deadline // self.slots ** level) % self.slots
+        self.wheels[level][slot][key] = deadline
+        self.where[key] = (level, slot)
+
+    def schedule(self, key, deadline):
+        self.cancel(key)
+        # already due -> fire on the next tick
+        self._place(key, max(deadline, self.now + 1))
+
+    def cancel(self, key):
+        loc = self.where.pop(key, None)
+        if loc is None:
+            return False
+        level, slot = loc
+        del self.wheels[level][slot][key]
+        return True
+
+    # -------------------------
+    # Time
+    # -------------------------
+    def _cascade(self):
+        # find the highest level whose bucket boundary we just crossed
+        top = 0
+        width = self.slots
+        while top < self.levels - 1 and self.now % width == 0:
+            top += 1
+            width *= self.slots
+
+        for level in range(top, 0, -1):
+            slot = (self.now // self.slots ** level) % self.slots
+            bucket = self.wheels[level][slot]
+            if not bucket:
+                continue
+            self.wheels[level][slot] = {}
+            for key, deadline in bucket.items():
+                del self.where[key]
+                self._place(key, deadline)
+
+    def advance(self, now):
+        """
+        Move the wheel forward to `now` and return the keys that expired
+        on the way, in deadline order.
+        """
+        expired = []
+
+        while self.now < now:
+            self.now += 1
+            self._cascade()
+
+            slot = self.now % self.slots
+            bucket = self.wheels[0][slot]
+            if not bucket:
+                continue
+
+            due = [k for k, d in bucket.items() if d <= self.now]
+            for key in due:
+                del bucket[key]
+                del self.where[key]
+            expired.extend(due)
+
+        return expired